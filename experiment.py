@@ -1,6 +1,11 @@
+import argparse
+import os
+import time
 import cv2
+import numpy as np
 from tracker import MouseTracker
-from logic import EventLogic
+from logic import make_event_logic
+from grabber import FrameGrabber
 import input
 
 """
@@ -21,35 +26,138 @@ integrar componentes que ya funcionan de forma independiente.
 
 # --- Inicialización del video ---
 
-input = input.input2 # Condiciones iniciales
+# Condiciones iniciales: una de las configuraciones de input.py
+parser = argparse.ArgumentParser(description="Ejecuta el experimento sobre un video.")
+parser.add_argument(
+    "--config",
+    default="input2",
+    choices=[name for name in vars(input) if name.startswith("input")],
+    help="configuración de input.py a usar (por defecto input2)",
+)
+args = parser.parse_args()
 
-video_path = input['video_path']
+input = getattr(input, args.config)
 
-cap = cv2.VideoCapture(video_path)
+video_path = input['video_path']
+# Solo se decodifica 1 de cada `stride` frames; el resto solo se avanza
+stride = input.get('stride', 1)
+# Ventanas de visualización; DM_DISPLAY=0 para corridas sin GUI
+SHOW_GUI = os.environ.get("DM_DISPLAY", "1") == "1"
+# Video con la visualización (opcional)
+output_path = input.get('output_path')
+# Sin ventanas ni video de salida no se dibuja sobre el frame
+DRAW = SHOW_GUI or output_path is not None
+
+# Entrada en vivo: cámara (índice) o stream
+is_live = isinstance(video_path, int) or video_path.startswith(
+    ("rtsp://", "http://", "/dev/")
+)
+
+cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG)
+if not cap.isOpened():
+    cap = cv2.VideoCapture(video_path)
+if not cap.isOpened():
+    raise SystemExit(f"No se pudo abrir el video {video_path!r}")
 fps = cap.get(cv2.CAP_PROP_FPS)
+# Si el backend no conoce la tasa (cámaras, algunos streams) OpenCV
+# devuelve 0 (-1 en OpenCV 5). En vivo el tiempo se toma entonces del
+# reloj; en archivos se asume DEFAULT_FPS.
+DEFAULT_FPS = 30.0
+wall_clock = False
+if not fps > 0:
+    wall_clock = is_live
+    print(
+        f"Advertencia: FPS desconocido para {video_path!r}; "
+        + ("se usa el reloj del sistema" if wall_clock else f"se asume {DEFAULT_FPS:g}")
+    )
+    fps = DEFAULT_FPS
+# Duración de un frame: t = frame_idx * inv_fps evita dividir en cada frame
+inv_fps = 1.0 / fps
+width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
 frame_idx = 0
 
+# En vivo OpenCV acumula varios frames en su buffer interno y el tracker
+# procesaría imágenes atrasadas. Se limita el buffer a 1 frame para
+# trabajar siempre con el más reciente.
+# Algunos backends ignoran la propiedad (set devuelve False o V4L2 emite
+# un warning); en ese caso la alternativa es vaciar el buffer llamando
+# cap.grab() en un loop hasta que una llamada bloquee más de ~5 ms, lo
+# que indica que ya no quedan frames viejos.
+if is_live:
+    try:
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    except cv2.error:
+        pass
+
+# La escritura del video de salida queda en manos de VideoWriter y el
+# buffer del sistema operativo, sin ventanas ni waitKey
+writer = None
+if output_path is not None:
+    writer = cv2.VideoWriter(
+        output_path,
+        cv2.VideoWriter_fourcc('m', 'p', '4', 'v'),
+        fps if is_live else fps / stride,
+        (width, height),
+    )
+
+# Buffer reutilizado para la conversión BGR -> GRAY
+gray_buf = np.empty((height, width), dtype=np.uint8)
+
 # --- Definición de regiones de interés ---
 # Más adelante podrán venir de mouse, archivo o GUI,
 # sin cambiar el resto del backend.
 regions = input['regions']
 
 # --- Inicialización de módulos del backend ---
-tracker = MouseTracker(min_area=100) #poner min_area=100 para otro video
-logic = EventLogic(regions)
+# La detección corre a mitad de resolución; la posición se entrega en
+# coordenadas del frame original
+tracker = MouseTracker(min_area=100, scale=0.5) #poner min_area=100 para otro video
+# Con el tamaño del frame las regiones se rasterizan una sola vez
+image_shape = (height, width) if height and width else None
+logic = make_event_logic(regions, image_shape=image_shape)
+
+# En vivo la captura corre en un hilo aparte que solo conserva el último
+# frame: si el procesamiento se atrasa, se descartan frames viejos.
+grabber = None
+if is_live:
+    grabber = FrameGrabber(cap)
+    if not grabber.start():
+        cap.release()
+        raise SystemExit(f"No se pudo leer ningún frame de {video_path!r}")
+    t0 = time.monotonic()
 
 # --- Loop principal del experimento ---
 while True:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    # Tiempo actual en segundos
-    t = frame_idx / fps
-    frame_idx += 1
-
-    # Conversión a escala de grises para el detector
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if grabber is not None:
+        ret, frame, frame_idx = grabber.read()
+        if not ret:
+            break
+
+        # Tiempo actual en segundos
+        t = time.monotonic() - t0 if wall_clock else frame_idx * inv_fps
+    else:
+        # grab() avanza el stream sin convertir el frame; la conversión
+        # (retrieve) solo se paga en los frames que se procesan
+        ret = cap.grab()
+        if not ret:
+            break
+
+        # Tiempo actual en segundos (se cuenta cada frame, procesado o no)
+        t = frame_idx * inv_fps
+        skip = frame_idx % stride != 0
+        frame_idx += 1
+
+        if skip:
+            continue
+
+        ret, frame = cap.retrieve()
+        if not ret:
+            break
+
+    # Conversión a escala de grises para el detector (la misma con o sin
+    # visualización, para que los resultados no dependan de DM_DISPLAY)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray_buf)
 
     # Localización del ratón
     pos_real, fgmask = tracker.locate(gray)
@@ -58,33 +166,41 @@ while True:
     logic.update(pos_real, t)
 
     # --- Visualización (solo para depuración) ---
-    for region in regions.regions:
-        state = logic.states[region.region_id]
+    if not DRAW:
+        continue
 
-        if state.inside:
-            color = (0, 0, 255)   # rojo
-        else:
-            color = (0, 255, 0)   # verde
+    # Colores de regiones y hitbox en una sola pasada
+    inside_any = False
+    for region, inside in zip(regions.regions, logic.inside.tolist()):
+        inside_any |= inside
+        region.draw(frame, (0, 0, 255) if inside else (0, 255, 0))  # rojo / verde
 
-        region.draw(frame, color)
-    
     # --- Visualización de la hitbox del ratón ---
     if pos_real is not None:
-        inside_any = any(logic.states[r.region_id].inside for r in regions.regions)
         hitbox_color = (0, 0, 255) if inside_any else (0, 255, 0)
         x, y = pos_real
         #size = 35 #hay que cambiar para cada tamaño de ratón
         size = 10
         cv2.rectangle(frame, (x-size, y-size), (x+size, y+size), hitbox_color, 2)
 
-    cv2.imshow("frame", frame)
-    cv2.imshow("fgmask", fgmask)
+    if writer is not None:
+        writer.write(frame)
+
+    if SHOW_GUI:
+        cv2.imshow("frame", frame)
+        cv2.imshow("fgmask", fgmask)
 
-    # Salir con ESC
-    if cv2.waitKey(30) & 0xFF == 27:
-        break
+        # Salir con ESC (waitKey(1): no limitar los FPS del procesamiento)
+        if cv2.waitKey(1) & 0xFF == 27:
+            break
 
 
 # --- Liberación de recursos ---
-cap.release()
-cv2.destroyAllWindows()
+# La captura solo se libera cuando el hilo terminó. Si sigue bloqueado
+# en cap.read(), el proceso termina igual (el hilo es daemon).
+if grabber is None or grabber.stop():
+    cap.release()
+if writer is not None:
+    writer.release()
+if SHOW_GUI:
+    cv2.destroyAllWindows()
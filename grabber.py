@@ -0,0 +1,147 @@
+import threading
+
+import numpy as np
+
+
+class FrameGrabber:
+    """
+    Captura de frames en un hilo independiente.
+
+    Lee continuamente de un `cv2.VideoCapture` y conserva únicamente el
+    frame más reciente. Si el procesamiento es más lento que la fuente,
+    los frames atrasados se descartan en lugar de acumularse en el
+    buffer de OpenCV.
+
+    Pensado para entradas en vivo (cámara o stream). Con archivos de
+    video descartaría frames que sí se quieren analizar.
+
+    Internamente usa tres buffers preasignados que rotan bajo un lock:
+    - el que está escribiendo el hilo de captura,
+    - el que contiene el último frame completo,
+    - el que está usando el loop principal.
+    De esta forma el hilo nunca escribe sobre el frame en proceso.
+
+    Atributos
+    ----------
+    cap : cv2.VideoCapture
+        Fuente de video ya abierta.
+    new_frame : threading.Event
+        Se activa cuando hay un frame nuevo (o cuando la captura terminó).
+    """
+
+    def __init__(self, cap):
+        """
+        Parámetros
+        ----------
+        cap : cv2.VideoCapture
+            Fuente de video ya abierta.
+        """
+        self.cap = cap
+        self.lock = threading.Lock()
+        self.new_frame = threading.Event()
+        self.stopped = False
+        self.thread = None
+
+        self.buf = None
+        self.write_idx = 0
+        self.ready_idx = 1
+        self.read_idx = 2
+
+        # Índice (en la fuente) del frame guardado en buf[ready_idx]
+        self.ready_frame_idx = -1
+        self.fresh = False
+        self.frame_count = 0
+
+    def start(self):
+        """
+        Lee el primer frame, preasigna los buffers e inicia el hilo.
+
+        Retorna
+        -------
+        bool
+            False si no se pudo leer ningún frame. En ese caso `read`
+            retorna de inmediato (False, None, -1).
+        """
+        ret, frame = self.cap.read()
+        if not ret:
+            self.stopped = True
+            self.new_frame.set()
+            return False
+
+        self.buf = [np.empty_like(frame), frame, np.empty_like(frame)]
+        self.ready_frame_idx = 0
+        self.frame_count = 1
+        self.fresh = True
+        self.new_frame.set()
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return True
+
+    def _run(self):
+        while not self.stopped:
+            ret, frame = self.cap.read(self.buf[self.write_idx])
+            if not ret:
+                break
+
+            with self.lock:
+                # OpenCV puede reasignar el buffer si cambia la forma
+                self.buf[self.write_idx] = frame
+                self.write_idx, self.ready_idx = self.ready_idx, self.write_idx
+                self.ready_frame_idx = self.frame_count
+                self.fresh = True
+                self.new_frame.set()
+
+            self.frame_count += 1
+
+        with self.lock:
+            self.stopped = True
+            self.new_frame.set()
+
+    def read(self):
+        """
+        Espera y retorna el frame más reciente.
+
+        El frame retornado es válido hasta la siguiente llamada a `read`.
+
+        Retorna
+        -------
+        ret : bool
+            False cuando la captura terminó y no quedan frames.
+        frame : np.ndarray or None
+            Último frame capturado.
+        frame_idx : int
+            Índice del frame en la fuente (cuenta también los descartados).
+        """
+        self.new_frame.wait()
+        with self.lock:
+            # Solo ocurre cuando el hilo de captura terminó
+            if not self.fresh:
+                return False, None, -1
+
+            self.read_idx, self.ready_idx = self.ready_idx, self.read_idx
+            self.fresh = False
+            if not self.stopped:
+                self.new_frame.clear()
+            return True, self.buf[self.read_idx], self.ready_frame_idx
+
+    def stop(self, timeout=1.0):
+        """
+        Detiene el hilo de captura.
+
+        Parámetros
+        ----------
+        timeout : float
+            Tiempo máximo (en segundos) a esperar por el hilo.
+
+        Retorna
+        -------
+        bool
+            True si el hilo terminó. Si es False el hilo sigue dentro de
+            `cap.read()` y la captura no debe liberarse todavía.
+        """
+        self.stopped = True
+        if self.thread is not None:
+            self.thread.join(timeout)
+            return not self.thread.is_alive()
+        return True
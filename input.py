@@ -2,6 +2,7 @@ from regions import RegionManager, PolygonRegion, CircleRegion
 
 input1 = {
 	"video_path" : "Mice maze experiment.mp4",
+	"stride" : 1, # procesar 1 de cada `stride` frames (1 = todos)
 	"regions": RegionManager([
 							PolygonRegion("este",  [[620,450],[903,450],[900,320],[622,320]]),
 							PolygonRegion("oeste", [[272,450],[274,320],[566,320],[562,450]])
@@ -11,6 +12,7 @@ input1 = {
 
 input2 = {
 	"video_path" : "Escopolamina 1.avi",
+	"stride" : 1,
 	"regions": RegionManager([
 							CircleRegion("centro",  [151,110], 40),
 							]),
@@ -19,6 +21,7 @@ input2 = {
 
 input3 = {
 	"video_path" : "Escopolamina 1_1280x720.avi",
+	"stride" : 1,
 	"regions": RegionManager([
 							CircleRegion("centro",  [617,330], 100),
 							]),
@@ -1,3 +1,14 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+from logic_kernel import HAVE_NUMBA, step
+
+# Con menos regiones, recorrerlas en Python es más rápido que armar
+# arreglos NumPy o llamar al paso compilado en cada frame
+VECTOR_MIN_REGIONS = 16
+
+
 class ZoneState:
     """
     Estado temporal asociado a una región de interés.
@@ -18,7 +29,12 @@ class ZoneState:
         dentro de la región.
     entries : int
         Número total de veces que el objeto ha entrado a la región.
+
+    `EventLogic` guarda el estado en arreglos; esta clase es la vista
+    (copia) de una región que entrega `EventLogic.states`.
     """
+    __slots__ = ("inside", "enter_time", "total_time", "entries")
+
     def __init__(self):
         self.inside = False
         self.enter_time = None
@@ -26,6 +42,34 @@ class ZoneState:
         self.entries = 0
 
 
+class ZoneStates(Mapping):
+    """
+    Vista de solo lectura de los estados de `EventLogic` por región.
+
+    Mantiene la interfaz del antiguo diccionario region_id -> ZoneState:
+    cada acceso construye un ZoneState a partir de los arreglos.
+    """
+    def __init__(self, logic):
+        self._logic = logic
+
+    def __getitem__(self, region_id):
+        logic = self._logic
+        i = logic.index[region_id]
+
+        state = ZoneState()
+        state.inside = bool(logic.inside[i])
+        state.enter_time = None if np.isnan(logic.enter_time[i]) else float(logic.enter_time[i])
+        state.total_time = float(logic.total_time[i])
+        state.entries = int(logic.entries[i])
+        return state
+
+    def __iter__(self):
+        return iter(self._logic.region_ids)
+
+    def __len__(self):
+        return len(self._logic.region_ids)
+
+
 class EventLogic:
     """
     Lógica de eventos de entrada y salida para múltiples regiones.
@@ -34,23 +78,93 @@ class EventLogic:
     y determina eventos de entrada y salida en cada región de interés.
     No realiza detección visual ni define geometría: solo coordina estados.
 
+    El estado de las regiones se guarda como arreglos paralelos (uno por
+    atributo, una posición por región), de modo que las transiciones de
+    todas las regiones se calculan con operaciones vectorizadas o, si
+    Numba está disponible, con el paso compilado de `logic_kernel`. Con
+    pocas regiones ese costo fijo no compensa, por lo que por defecto
+    `update` recorre las regiones una a una; `make_event_logic` pide la
+    versión vectorizada a partir de `VECTOR_MIN_REGIONS` regiones.
+
+    La pertenencia a cada región es la misma en ambos modos (la de
+    `Region.contains`), de modo que agregar regiones no cambia los
+    resultados de las demás.
+
     Supuestos
     ---------
+    - `region_manager` tiene el método `contains_many(position)`, que
+      retorna un arreglo bool con una posición por región.
     - `region_manager.regions` es una lista de regiones con:
         - atributo `id` único
-        - método `contains(position)` -> bool
+        - método `mask(shape)` -> np.ndarray (si se usa `image_shape`)
     - El tiempo `t` está dado en segundos y es monótono creciente.
 
+    En el modo vectorizado, si se entrega `image_shape`, las regiones no
+    circulares se rasterizan una vez (`region_manager.rasterize`) y su
+    pertenencia se resuelve con una lectura de la máscara de etiquetas.
+
     Atributos
     ----------
     regions : list
         Lista de regiones de interés.
-    states : dict
-        Diccionario que mapea region.id -> ZoneState.
+    region_ids : list
+        Identificadores de las regiones, en el orden de los arreglos.
+    index : dict
+        Diccionario que mapea region.id -> posición en los arreglos.
+    inside : np.ndarray of bool
+        Si el objeto está dentro de cada región.
+    enter_time : np.ndarray of float
+        Timestamp del último ingreso (NaN si el objeto no está dentro).
+    total_time : np.ndarray of float
+        Tiempo total acumulado dentro de cada región.
+    entries : np.ndarray of int64
+        Número de ingresos a cada región.
+    states : ZoneStates
+        Vista que mapea region.id -> ZoneState.
     """
-    def __init__(self, region_manager):
+
+    def __init__(self, region_manager, image_shape=None, vectorized=False):
+        self.region_manager = region_manager
         self.regions = region_manager.regions
-        self.states = {r.region_id: ZoneState() for r in self.regions}
+        self.region_ids = [r.region_id for r in self.regions]
+        self.index = {rid: i for i, rid in enumerate(self.region_ids)}
+
+        n = len(self.regions)
+        self.inside = np.zeros(n, dtype=bool)
+        self.enter_time = np.full(n, np.nan)
+        self.total_time = np.zeros(n)
+        self.entries = np.zeros(n, dtype=np.int64)
+        self.states = ZoneStates(self)
+
+        # Pocas regiones: `update` recorre las regiones una a una. Lleva
+        # una copia de `inside` como lista, más barata de leer por
+        # elemento que el arreglo; los arreglos se escriben solo en las
+        # transiciones.
+        self._scalar = not vectorized
+        self._inside_list = [False] * n
+
+        if image_shape is not None and not self._scalar:
+            region_manager.rasterize(image_shape)
+
+        # Argumentos fijos del paso compilado. Requiere Numba, el modo
+        # vectorizado y que las regiones no circulares estén rasterizadas;
+        # si no, se usa la versión NumPy de `update`.
+        self._kernel_args = None
+        self._kernel_bounds = None
+        rm = region_manager
+        if self._scalar:
+            return
+        if HAVE_NUMBA and (rm.other_idx.size == 0 or rm.other_labels is not None):
+            if rm.other_labels is not None:
+                labels, bits = rm.other_labels, rm.other_bits
+                self._kernel_bounds = labels.shape
+            else:
+                labels = np.zeros((1, 1), dtype=np.uint16)
+                bits = np.zeros(0, dtype=np.uint16)
+            self._kernel_args = (
+                rm.circle_idx, rm.centers_xy, rm.radius_sq,
+                rm.other_idx, labels, bits,
+            )
 
     def update(self, position, t):
         """
@@ -74,18 +188,151 @@ class EventLogic:
         if position is None:
             return
 
-        for region in self.regions:
-            state = self.states[region.region_id]
-            inside_now = region.contains(position)
-
-            # Evento de entrada
-            if inside_now and not state.inside:
-                state.inside = True
-                state.enter_time = t
-                state.entries += 1
-
-            # Evento de salida
-            elif not inside_now and state.inside:
-                state.inside = False
-                state.total_time += t - state.enter_time
-                state.enter_time = None
+        # Pocas regiones: se prueba cada una con `contains` y solo se
+        # tocan los arreglos cuando hay una transición
+        if self._scalar:
+            inside = self._inside_list
+            for i, region in enumerate(self.regions):
+                if region.contains(position):
+                    # Evento de entrada
+                    if not inside[i]:
+                        inside[i] = True
+                        self.inside[i] = True
+                        self.enter_time[i] = t
+                        self.entries[i] += 1
+
+                # Evento de salida
+                elif inside[i]:
+                    inside[i] = False
+                    self.inside[i] = False
+                    self.total_time[i] += t - self.enter_time[i]
+                    self.enter_time[i] = np.nan
+            return
+
+        if self._kernel_args is not None:
+            x, y = position
+            bounds = self._kernel_bounds
+            # La máscara solo se lee en píxeles enteros dentro de la imagen
+            if bounds is None or (
+                0 <= x < bounds[1] and 0 <= y < bounds[0] and x == int(x) and y == int(y)
+            ):
+                step(
+                    float(x), float(y), float(t), *self._kernel_args,
+                    self.inside, self.enter_time, self.total_time, self.entries,
+                )
+                return
+
+        self._apply(self.region_manager.contains_many(position), t)
+
+    def _apply(self, inside_now, t):
+        """
+        Aplica los eventos de entrada y salida dada la pertenencia actual
+        `inside_now` (arreglo bool, una posición por región).
+        """
+        # Eventos de entrada y salida
+        enters = inside_now & ~self.inside
+        exits = ~inside_now & self.inside
+
+        self.entries += enters
+        self.enter_time[enters] = t
+        self.total_time[exits] += t - self.enter_time[exits]
+        self.enter_time[exits] = np.nan
+        self.inside = inside_now
+
+
+class CircleOnlyEventLogic(EventLogic):
+    """
+    `EventLogic` para experimentos donde todas las regiones son círculos.
+
+    La pertenencia es siempre la prueba de distancia sobre los arreglos
+    de `RegionManager`, sin máscara de etiquetas ni verificación de
+    bordes de la imagen.
+    """
+
+    def __init__(self, region_manager):
+        super().__init__(region_manager, vectorized=True)
+
+    def update(self, position, t):
+        if position is None:
+            return
+
+        x, y = position
+        if self._kernel_args is not None:
+            step(
+                float(x), float(y), float(t), *self._kernel_args,
+                self.inside, self.enter_time, self.total_time, self.entries,
+            )
+            return
+
+        rm = self.region_manager
+        dx = rm.centers_xy[:, 0] - x
+        dy = rm.centers_xy[:, 1] - y
+        self._apply(dx * dx + dy * dy <= rm.radius_sq, t)
+
+
+class PolygonOnlyEventLogic(EventLogic):
+    """
+    `EventLogic` para experimentos sin círculos, con las regiones
+    rasterizadas (requiere `image_shape`).
+
+    La pertenencia es una lectura de la máscara de etiquetas; solo los
+    puntos fuera de la imagen o entre píxeles usan la prueba geométrica.
+    """
+
+    def __init__(self, region_manager, image_shape):
+        super().__init__(region_manager, image_shape=image_shape, vectorized=True)
+        if region_manager.other_labels is None:
+            raise ValueError("PolygonOnlyEventLogic requiere al menos una región no circular")
+        self._labels = region_manager.other_labels
+        self._bits = region_manager.other_bits
+
+    def update(self, position, t):
+        if position is None:
+            return
+
+        x, y = int(position[0]), int(position[1])
+        h, w = self._labels.shape
+        if 0 <= x < w and 0 <= y < h and x == position[0] and y == position[1]:
+            if self._kernel_args is not None:
+                step(
+                    float(position[0]), float(position[1]), float(t), *self._kernel_args,
+                    self.inside, self.enter_time, self.total_time, self.entries,
+                )
+                return
+            self._apply((self._labels[y, x] & self._bits) != 0, t)
+        else:
+            self._apply(self.region_manager.contains_many(position), t)
+
+
+def make_event_logic(region_manager, image_shape=None):
+    """
+    Construye la lógica de eventos especializada para las regiones dadas.
+
+    El tipo de regiones se inspecciona una sola vez, al inicio, de modo
+    que `update` no decide en cada frame qué prueba de pertenencia usar.
+    Con menos de `VECTOR_MIN_REGIONS` regiones se usa `EventLogic`, que
+    las recorre una a una; desde ese número, la versión vectorizada.
+    Las clases solo difieren en velocidad: la pertenencia es la misma en
+    todas.
+
+    Parámetros
+    ----------
+    region_manager : RegionManager
+        Regiones de interés del experimento.
+    image_shape : tuple (height, width), opcional
+        Tamaño de los frames, para rasterizar las regiones no circulares.
+
+    Retorna
+    -------
+    EventLogic
+        `CircleOnlyEventLogic`, `PolygonOnlyEventLogic` o `EventLogic`
+        si hay pocas regiones o una mezcla de tipos de regiones.
+    """
+    n = len(region_manager.regions)
+    if n == 0 or n < VECTOR_MIN_REGIONS:
+        return EventLogic(region_manager, image_shape=image_shape)
+    if region_manager.other_idx.size == 0:
+        return CircleOnlyEventLogic(region_manager)
+    if region_manager.circle_idx.size == 0 and image_shape is not None:
+        return PolygonOnlyEventLogic(region_manager, image_shape)
+    return EventLogic(region_manager, image_shape=image_shape, vectorized=True)
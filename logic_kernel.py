@@ -0,0 +1,79 @@
+import numpy as np
+
+"""
+logic_kernel.py
+
+Paso por frame de `EventLogic` compilado con Numba.
+
+Recibe la posición del objeto y los arreglos de regiones y estados
+(ver `RegionManager` y `EventLogic`) y actualiza los estados en su
+lugar, sin pasar por el intérprete de Python en cada región.
+
+Numba es opcional: si no está instalado, `HAVE_NUMBA` es False y
+`EventLogic` usa su versión vectorizada con NumPy.
+"""
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        def wrap(func):
+            return func
+        return wrap
+
+
+@njit(cache=True, inline="always")
+def _transition(i, in_now, t, inside, enter_time, total_time, entries):
+    # Evento de entrada
+    if in_now and not inside[i]:
+        inside[i] = True
+        enter_time[i] = t
+        entries[i] += 1
+
+    # Evento de salida
+    elif inside[i] and not in_now:
+        inside[i] = False
+        total_time[i] += t - enter_time[i]
+        enter_time[i] = np.nan
+
+
+@njit(cache=True)
+def step(
+    x, y, t,
+    circle_idx, centers, radii_sq,
+    other_idx, labels, label_bits,
+    inside, enter_time, total_time, entries,
+):
+    """
+    Actualiza el estado de todas las regiones para una posición.
+
+    Parámetros
+    ----------
+    x, y : float
+        Posición del objeto. Si hay regiones no circulares, (x, y) debe
+        caer dentro de `labels`.
+    t : float
+        Timestamp actual en segundos.
+    circle_idx, centers, radii_sq : np.ndarray
+        Posición en los estados, centros y radios al cuadrado de los
+        círculos.
+    other_idx, labels, label_bits : np.ndarray
+        Posición en los estados, máscara de etiquetas y bit de cada
+        región no circular.
+    inside, enter_time, total_time, entries : np.ndarray
+        Estados de `EventLogic`; se modifican en su lugar.
+    """
+    for k in range(circle_idx.shape[0]):
+        dx = centers[k, 0] - x
+        dy = centers[k, 1] - y
+        in_now = dx * dx + dy * dy <= radii_sq[k]
+        _transition(circle_idx[k], in_now, t, inside, enter_time, total_time, entries)
+
+    if other_idx.shape[0] > 0:
+        label = labels[int(y), int(x)]
+        for k in range(other_idx.shape[0]):
+            in_now = (label & label_bits[k]) != 0
+            _transition(other_idx[k], in_now, t, inside, enter_time, total_time, entries)
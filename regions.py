@@ -101,6 +101,9 @@ class PolygonRegion(Region):
 
     Los puntos se almacenan internamente en el formato canónico
     requerido por OpenCV: (N, 1, 2), dtype=int32.
+
+    El polígono debe ser simple (sus lados no se cruzan); de lo contrario
+    `mask` y `contains` pueden no coincidir.
     """
 
     def __init__(self, region_id, points):
@@ -124,19 +127,54 @@ class PolygonRegion(Region):
         if self.points.shape[0] < 3:
             raise ValueError("Un polígono debe tener al menos 3 puntos")
 
+        # Arreglos contiguos y de solo lectura: OpenCV los usa sin
+        # copiarlos. pointPolygonTest recibe la versión float32 para no
+        # convertir los vértices en cada llamada.
+        self.points = np.ascontiguousarray(self.points)
+        self.points.setflags(write=False)
+        self._points_f32 = self.points.astype(np.float32)
+        self._points_f32.setflags(write=False)
+
+        # Caja envolvente (AABB): descarta la mayoría de los puntos antes
+        # de la prueba de pertenencia
+        self._xmin = int(self.points[:, 0, 0].min())
+        self._ymin = int(self.points[:, 0, 1].min())
+        self._xmax = int(self.points[:, 0, 0].max())
+        self._ymax = int(self.points[:, 0, 1].max())
+
     def contains(self, point):
         """
         Determina si un punto está dentro o sobre el borde del polígono.
         """
-        pt = (float(point[0]), float(point[1]))
-        return cv2.pointPolygonTest(self.points, pt, False) >= 0
+        x, y = point[0], point[1]
+        if x < self._xmin or x > self._xmax or y < self._ymin or y > self._ymax:
+            return False
+
+        pt = (float(x), float(y))
+        return cv2.pointPolygonTest(self._points_f32, pt, False) >= 0
 
     def mask(self, shape):
         """
         Genera una máscara binaria del polígono.
+
+        El píxel (x, y) vale 255 si y solo si `contains((x, y))`. El
+        relleno de OpenCV marca como dentro algunos píxeles de los lados
+        inclinados que `pointPolygonTest` deja fuera, por lo que los
+        píxeles a menos de 2 px del contorno se evalúan con la prueba
+        geométrica.
         """
         mask = np.zeros(shape, dtype=np.uint8)
         cv2.drawContours(mask, [self.points], -1, 255, -1)
+
+        edge = np.zeros(shape, dtype=np.uint8)
+        cv2.polylines(edge, [self.points], True, 255, 5)
+        ys, xs = np.nonzero(edge)
+        test = cv2.pointPolygonTest
+        pts = self._points_f32
+        mask[ys, xs] = [
+            255 if test(pts, (x, y), False) >= 0 else 0
+            for x, y in zip(xs.tolist(), ys.tolist())
+        ]
         return mask
 
     def draw(self, frame, color=(0, 255, 0), thickness=2):
@@ -211,6 +249,30 @@ class RegionManager:
     Esta clase existe para centralizar el manejo de regiones y
     proporcionar una interfaz común al resto del backend.
     No implementa lógica ni eventos.
+
+    Los círculos se guardan además como arreglos paralelos (centros y
+    radios al cuadrado) para evaluar todos con una sola expresión NumPy.
+    El resto de las regiones puede rasterizarse una vez en una máscara de
+    etiquetas (ver `rasterize`). Se asume que la lista de regiones no
+    cambia después de construir el manager.
+
+    Atributos
+    ----------
+    regions : list of Region
+        Lista de regiones de interés.
+    circle_idx : np.ndarray of intp
+        Posición en `regions` de cada círculo.
+    centers_xy : np.ndarray, shape (N, 2), float64
+        Centros de los círculos.
+    radius_sq : np.ndarray, shape (N,), float64
+        Radios al cuadrado de los círculos.
+    other_idx : np.ndarray of intp
+        Posición en `regions` de cada región no circular.
+    other_labels : np.ndarray or None
+        Máscara de etiquetas de las regiones no circulares (None hasta
+        llamar `rasterize`).
+    other_bits : np.ndarray or None
+        Bit de cada región no circular dentro de `other_labels`.
     """
     def __init__(self, regions):
         """
@@ -220,3 +282,113 @@ class RegionManager:
             Lista de regiones de interés.
         """
         self.regions = regions
+
+        circle_idx = [i for i, r in enumerate(regions) if isinstance(r, CircleRegion)]
+        self.circle_idx = np.array(circle_idx, dtype=np.intp)
+        self._other = [(i, r) for i, r in enumerate(regions) if not isinstance(r, CircleRegion)]
+        self.other_idx = np.array([i for i, _ in self._other], dtype=np.intp)
+
+        self.centers_xy = np.array(
+            [regions[i].center for i in circle_idx], dtype=np.float64
+        ).reshape(-1, 2)
+        self.radius_sq = np.array(
+            [regions[i].radius * regions[i].radius for i in circle_idx], dtype=np.float64
+        )
+
+        self.other_labels = None
+        self.other_bits = None
+
+    def rasterize(self, shape):
+        """
+        Precalcula la máscara de etiquetas de las regiones no circulares.
+
+        Desde ese momento `contains_many` resuelve esas regiones con una
+        sola lectura de la máscara en lugar de una prueba geométrica
+        por región. La máscara coincide con `contains` en los píxeles
+        enteros (las posiciones que entrega `MouseTracker`); para el resto
+        de los puntos se mantiene la prueba geométrica.
+
+        Parámetros
+        ----------
+        shape : tuple (height, width)
+            Forma de los frames (frame.shape[:2]).
+        """
+        others = [r for _, r in self._other]
+        if not others:
+            return
+        self.other_labels = self.label_mask(shape, others)
+        dtype = self.other_labels.dtype
+        self.other_bits = np.left_shift(dtype.type(1), np.arange(len(others), dtype=dtype))
+
+    def contains_many(self, point):
+        """
+        Determina a qué regiones pertenece un punto.
+
+        Parámetros
+        ----------
+        point : tuple (x, y)
+            Punto en coordenadas de imagen.
+
+        Retorna
+        -------
+        np.ndarray
+            Arreglo bool con una posición por región, en el orden de
+            `regions`.
+        """
+        x, y = point
+        inside = np.zeros(len(self.regions), dtype=bool)
+
+        dx = self.centers_xy[:, 0] - x
+        dy = self.centers_xy[:, 1] - y
+        inside[self.circle_idx] = dx * dx + dy * dy <= self.radius_sq
+
+        labels = self.other_labels
+        if labels is not None:
+            xi, yi = int(x), int(y)
+            h, w = labels.shape
+            if 0 <= xi < w and 0 <= yi < h and xi == x and yi == y:
+                inside[self.other_idx] = (labels[yi, xi] & self.other_bits) != 0
+                return inside
+
+        # Sin máscara, fuera de la imagen o entre píxeles: prueba geométrica
+        for i, region in self._other:
+            inside[i] = region.contains(point)
+        return inside
+
+    def label_mask(self, shape, regions=None):
+        """
+        Genera una máscara de etiquetas con varias regiones.
+
+        El bit i de cada píxel vale 1 si el píxel pertenece a la región
+        `regions[i]`, de modo que las regiones pueden superponerse.
+
+        Parámetros
+        ----------
+        shape : tuple (height, width)
+            Forma de la máscara (frame.shape[:2]).
+
+        regions : list of Region, opcional
+            Regiones a incluir. Por defecto, todas las del manager.
+
+        Retorna
+        -------
+        np.ndarray
+            Imagen uint16, uint32 o uint64 según el número de regiones.
+        """
+        if regions is None:
+            regions = self.regions
+
+        n = len(regions)
+        if n <= 16:
+            dtype = np.uint16
+        elif n <= 32:
+            dtype = np.uint32
+        elif n <= 64:
+            dtype = np.uint64
+        else:
+            raise ValueError("La máscara de etiquetas admite hasta 64 regiones")
+
+        labels = np.zeros(shape, dtype=dtype)
+        for i, region in enumerate(regions):
+            labels[region.mask(shape) > 0] |= dtype(1 << i)
+        return labels
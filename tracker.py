@@ -14,19 +14,58 @@ class MouseTracker:
     binaria asociada a la detección.
     """
 
-    def __init__(self, min_area=4000):
+    def __init__(self, min_area=4000, scale=1.0):
         """
         Inicializa el detector.
 
         Parámetros
         ----------
         min_area : int
-            Área mínima (en píxeles) que debe tener un contorno para
-            ser considerado como el ratón. Sirve para filtrar ruido.
+            Área mínima (en píxeles del frame original) que debe tener
+            un contorno para ser considerado como el ratón. Sirve para
+            filtrar ruido.
+        scale : float
+            Factor de reducción del frame antes de la detección (por
+            ejemplo 0.5 procesa la mitad de ancho y alto, 4 veces menos
+            píxeles). La posición retornada está siempre en coordenadas
+            del frame original.
         """
+        if not 0 < scale <= 1:
+            raise ValueError("La escala debe estar en (0, 1]")
+
         self.bg = cv2.bgsegm.createBackgroundSubtractorMOG()
         self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        # Dos dilataciones 3x3 equivalen a una con rect 5x5; con kernel
+        # rectangular OpenCV usa su versión separable
+        self.dilate_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
         self.min_area = min_area
+        self.scale = scale
+
+        # Área mínima equivalente en el frame reducido
+        self._min_area_scaled = min_area * scale * scale
+
+        # Buffers reutilizados entre frames (se asignan en el primer
+        # llamado a `locate`, cuando se conoce el tamaño del frame)
+        self._input_shape = None
+        self._small = None
+        self._fg = None
+        self._close = None
+        self._open = None
+        self._dil = None
+
+    def _alloc_buffers(self, shape):
+        h, w = shape
+        if self.scale != 1.0:
+            self._small = np.empty(
+                (max(1, round(h * self.scale)), max(1, round(w * self.scale))),
+                dtype=np.uint8,
+            )
+            shape = self._small.shape
+        self._input_shape = (h, w)
+        self._fg = np.empty(shape, dtype=np.uint8)
+        self._close = np.empty(shape, dtype=np.uint8)
+        self._open = np.empty(shape, dtype=np.uint8)
+        self._dil = np.empty(shape, dtype=np.uint8)
 
     def locate(self, gray_frame):
         """
@@ -48,30 +87,45 @@ class MouseTracker:
 
         fgmask : np.ndarray
             Máscara binaria resultante de la sustracción de fondo,
-            útil para depuración o visualización.
+            útil para depuración o visualización. Es un buffer interno
+            que se sobrescribe en el siguiente llamado y tiene el
+            tamaño del frame reducido según `scale`.
         """
-        fgmask = self.bg.apply(gray_frame)
-        fgmask = cv2.morphologyEx(fgmask, cv2.MORPH_CLOSE, self.kernel) #prueba
-        fgmask = cv2.morphologyEx(fgmask, cv2.MORPH_OPEN, self.kernel)
-        fgmask = cv2.dilate(fgmask, None, iterations=2)
+        if self._fg is None or self._input_shape != gray_frame.shape[:2]:
+            self._alloc_buffers(gray_frame.shape[:2])
+
+        if self._small is not None:
+            h, w = self._small.shape
+            cv2.resize(gray_frame, (w, h), dst=self._small, interpolation=cv2.INTER_AREA)
+            gray_frame = self._small
+
+        self.bg.apply(gray_frame, self._fg, learningRate=-1)
+        cv2.morphologyEx(self._fg, cv2.MORPH_CLOSE, self.kernel, dst=self._close) #prueba
+        cv2.morphologyEx(self._close, cv2.MORPH_OPEN, self.kernel, dst=self._open)
+        cv2.dilate(self._open, self.dilate_kernel, dst=self._dil)
+        fgmask = self._dil
 
         cnts = cv2.findContours(fgmask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[0]
         if not cnts:
             return None, fgmask
 
-        # fallback si el ratón es muy pequeño
-        if not cnts or all(cv2.contourArea(c)<self.min_area for c in cnts):
-            cnts = [c for c in cnts if cv2.contourArea(c) > 5]  # 5 px mínimo
-            
-        cnt = max(cnts, key=cv2.contourArea)
-        if cv2.contourArea(cnt) < self.min_area:
+        # Área de cada contorno, calculada una sola vez
+        areas = np.fromiter(
+            (cv2.contourArea(c) for c in cnts), dtype=np.float32, count=len(cnts)
+        )
+        idx = areas.argmax()
+        if areas[idx] < self._min_area_scaled:
             return None, fgmask
+        cnt = cnts[idx]
+
         # Centroide del contorno
         M = cv2.moments(cnt)
         if M["m00"] == 0:
             return None, fgmask
-        cx_real = int(M["m10"]/M["m00"])
-        cy_real = int(M["m01"]/M["m00"])
+        # Centroide en coordenadas del frame original. Con INTER_AREA el
+        # centro del píxel pequeño i cae en (i + 0.5) / scale - 0.5
+        cx_real = int((M["m10"]/M["m00"] + 0.5) / self.scale - 0.5)
+        cy_real = int((M["m01"]/M["m00"] + 0.5) / self.scale - 0.5)
         center_real = (cx_real, cy_real)
         
         # Guardar posición para el próximo frame